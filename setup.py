@@ -39,7 +39,6 @@ setup(
     package_data={'snippet': extra_files},
 	include_package_data=True,
     install_requires=[
-        'pyparsing==3.1.1',
         'argcomplete==3.1.6',
         'iterfzf==1.1.0.44.0',
         'colorama==0.4.6'
@@ -1,5 +1,7 @@
 from snippet.codecs import StringCodec
 
+_ESCAPE = str.maketrans({'\\': '\\\\', '"': '\\"', "'": "\\'"})
+
 
 class Codec(StringCodec):
     """ Add slashes before quotes. """
@@ -8,4 +10,4 @@ class Codec(StringCodec):
         super().__init__(author="bytebutcher", dependencies=[])
 
     def run(self, value):
-        return value.replace('\\', '\\\\').replace('"', '\\"').replace("'", "\\'")
+        return value.translate(_ESCAPE)
@@ -1,3 +1,5 @@
+import base64
+
 from snippet.codecs import StringCodec
 
 
@@ -8,6 +10,5 @@ class Codec(StringCodec):
         super().__init__(author="bytebutcher", dependencies=["base64"])
 
     def run(self, input):
-        import base64
         return base64.b64encode(input.encode('utf-8', errors="surrogateescape")).decode('utf-8',
                                                                                        errors="surrogateescape")
\ No newline at end of file
@@ -8,4 +8,9 @@ class Codec(StringCodec):
         super().__init__(author="bytebutcher", dependencies=[])
 
     def run(self, value):
-        return value and value[0].upper() + value[1:]
+        if not value:
+            return value
+        first = value[0]
+        upper = first.upper()
+        # Return the value itself when the first character is already capitalized (or has no case).
+        return value if upper == first else upper + value[1:]
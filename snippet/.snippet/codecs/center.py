@@ -1,4 +1,4 @@
-from snippet.codecs import StringCodec
+from snippet.codecs import StringCodec, to_int
 
 
 class Codec(StringCodec):
@@ -8,4 +8,4 @@ class Codec(StringCodec):
         super().__init__(author="bytebutcher", dependencies=[])
 
     def run(self, value, arg):
-        return value.center(int(arg))
\ No newline at end of file
+        return value.center(to_int(arg))
\ No newline at end of file
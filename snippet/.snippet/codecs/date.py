@@ -1,5 +1,9 @@
 from snippet.codecs import StringCodec
 from datetime import datetime
+from time import localtime as _localtime, strftime as _strftime
+
+# Directives which time.strftime either does not support (%f) or renders differently than a naive datetime (%z, %Z).
+_DATETIME_DIRECTIVES = ("%f", "%z", "%Z")
 
 
 class Codec(StringCodec):
@@ -9,4 +13,6 @@ class Codec(StringCodec):
         super().__init__(author="bytebutcher", dependencies=[])
 
     def run(self, input, format):
-        return datetime.fromtimestamp(float(input)).strftime(format)
\ No newline at end of file
+        if any(directive in format for directive in _DATETIME_DIRECTIVES):
+            return datetime.fromtimestamp(float(input)).strftime(format)
+        return _strftime(format, _localtime(float(input)))
\ No newline at end of file
@@ -1,5 +1,10 @@
+import re
+
 from snippet.codecs import StringCodec
 
+# Matches every character for which str.isalnum() is False.
+_RE_UNSAFE = re.compile(r'[\W_]')
+
 
 class Codec(StringCodec):
     """ Transforms a string to a safe file name by replacing all special-characters with an underscore. """
@@ -8,4 +13,4 @@ class Codec(StringCodec):
         super().__init__(author="bytebutcher", dependencies=[])
 
     def run(self, input):
-        return "".join([x if x.isalnum() else "_" for x in input])
\ No newline at end of file
+        return _RE_UNSAFE.sub("_", input)
\ No newline at end of file
@@ -1,3 +1,5 @@
+import hashlib
+
 from snippet.codecs import StringCodec
 
 
@@ -8,5 +10,4 @@ class Codec(StringCodec):
         super().__init__(author="bytebutcher", dependencies=["hashlib"])
 
     def run(self, input):
-        import hashlib
         return hashlib.sha1(input.encode('utf-8', errors='surrogateescape')).hexdigest()
\ No newline at end of file
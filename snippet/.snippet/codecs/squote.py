@@ -8,4 +8,4 @@ class Codec(StringCodec):
         super().__init__(author="bytebutcher", dependencies=[])
 
     def run(self, input):
-        return "'{}'".format(input)
\ No newline at end of file
+        return "'" + input + "'"
\ No newline at end of file
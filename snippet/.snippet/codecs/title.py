@@ -2,6 +2,9 @@ import re
 
 from snippet.codecs import StringCodec
 
+# Letters which str.title() wrongly capitalizes after an apostrophe (e.g. "They'Re") or a digit (e.g. "1St").
+_RE_TITLE_FIX = re.compile(r"[a-z]'[A-Z]|\d[A-Z]")
+
 
 class Codec(StringCodec):
     """ Convert a string into titlecase. """
@@ -10,5 +13,4 @@ class Codec(StringCodec):
         super().__init__(author="bytebutcher", dependencies=[])
 
     def run(self, value):
-        t = re.sub("([a-z])'([A-Z])", lambda m: m[0].lower(), value.title())
-        return re.sub(r'\d([A-Z])', lambda m: m[0].lower(), t)
+        return _RE_TITLE_FIX.sub(lambda m: m[0].lower(), value.title())
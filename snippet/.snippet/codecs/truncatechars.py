@@ -1,4 +1,4 @@
-from snippet.codecs import StringCodec
+from snippet.codecs import StringCodec, to_int
 
 
 class Codec(StringCodec):
@@ -8,5 +8,5 @@ class Codec(StringCodec):
         super().__init__(author="bytebutcher", dependencies=[])
 
     def run(self, value, arg):
-        length = int(arg)
+        length = to_int(arg)
         return value[:length]
\ No newline at end of file
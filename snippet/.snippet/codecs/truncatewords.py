@@ -1,4 +1,4 @@
-from snippet.codecs import StringCodec
+from snippet.codecs import StringCodec, to_int
 
 
 class Codec(StringCodec):
@@ -8,8 +8,9 @@ class Codec(StringCodec):
         super().__init__(author="bytebutcher", dependencies=[])
 
     def run(self, content, arg):
-        length = int(arg)
-        words = content.split()
+        length = to_int(arg)
+        # Split at most `length` times; the remainder ends up in the last item.
+        words = content.split(None, length)
         if len(words) <= length:
             return content
         else:
@@ -1,3 +1,5 @@
+import urllib.parse
+
 from snippet.codecs import StringCodec
 
 
@@ -8,5 +10,4 @@ class Codec(StringCodec):
         super().__init__(author="bytebutcher", dependencies=["urllib"])
 
     def run(self, input):
-        import urllib.parse
         return urllib.parse.quote_plus(input.encode('utf-8', errors='surrogateescape'))
\ No newline at end of file
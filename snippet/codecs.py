@@ -1,3 +1,4 @@
+from functools import lru_cache
 from inspect import signature
 
 
@@ -13,6 +14,18 @@ class Codec(object):
         pass
 
 
+@lru_cache(maxsize=16)
+def to_int(value):
+    """ Converts a codec argument to an integer. Cached since codecs are run with the same argument for every row. """
+    return int(value)
+
+
+@lru_cache(maxsize=64)
+def _get_arity(codec):
+    """ Returns the number of arguments a codec expects (not counting the input). Cached since inspecting is slow. """
+    return len(signature(codec.run).parameters) - 1
+
+
 class StringCodec(Codec):
     pass
 
@@ -30,7 +43,7 @@ class CodecRunner:
     def run(self, row_item, placeholder):
         def run_codec(codec, input, arguments):
             try:
-                expected_parameters = len(signature(codec.run).parameters) - 1  # do not count input
+                expected_parameters = _get_arity(codec)
                 actual_parameters = 1 if isinstance(arguments, str) else len(arguments)
                 if expected_parameters != actual_parameters:
                     raise Exception(
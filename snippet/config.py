@@ -1,30 +1,96 @@
 import os
 import sys
-
-from iterfzf import iterfzf
+import types
+from collections.abc import Mapping
 
 from snippet.logger import Logger
 from snippet.models import Data
 from snippet.utils import safe_join_path
 
 
+class _LazyCodecs(Mapping):
+    """ Map of codec names and codecs which only imports a codec when it is accessed for the first time. """
+
+    def __init__(self, codec_paths, logger):
+        self._codec_paths = codec_paths
+        self._logger = logger
+        self._codecs = {}
+        self._complete = False
+
+    def _load_codec(self, codec_name):
+        for codec_path in self._codec_paths:
+            if not os.path.isfile(os.path.join(codec_path, codec_name + ".py")):
+                continue
+            # Since the path may contain special characters which can not be processed by the __import__
+            # function we temporarily add the path in which the codecs are located to the PATH.
+            sys.path.append(codec_path)
+            try:
+                self._logger.debug("Loading codec %s at %s...", codec_name, codec_path)
+                return getattr(__import__(codec_name), "Codec")()
+            except Exception as err:
+                self._logger.warning("Loading codec %s failed!", codec_name)
+                self._logger.exception(err)
+            finally:
+                sys.path.pop()
+        return None
+
+    def _load_codecs(self):
+        if self._complete:
+            return
+        for codec_path in self._codec_paths:
+            if os.path.exists(codec_path):
+                for r, d, f in os.walk(codec_path):
+                    for file in f:
+                        filename, ext = os.path.splitext(file)
+                        if ext == ".py" and filename not in self._codecs:
+                            self._codecs[filename] = self._load_codec(filename)
+        self._complete = True
+
+    def __getitem__(self, codec_name):
+        if codec_name not in self._codecs:
+            if self._complete or not codec_name.isidentifier():
+                raise KeyError(codec_name)
+            # Unknown codecs are remembered as well so that the codec paths are only searched once.
+            self._codecs[codec_name] = self._load_codec(codec_name)
+        codec = self._codecs[codec_name]
+        if codec is None:
+            raise KeyError(codec_name)
+        return codec
+
+    def __iter__(self):
+        self._load_codecs()
+        return (codec_name for codec_name, codec in self._codecs.items() if codec is not None)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
 class Config(object):
 
     def __init__(self, app_name, paths, log_level):
         self.paths = paths
         self.format_template_paths = [safe_join_path(path, "templates") for path in paths]
         self.codec_paths = [safe_join_path(path, "codecs") for path in paths]
-        self.logger = Logger.initialize(app_name, "%(msg)s", log_level)
-        self.profile = self._load_profile()
-        self.codecs = self._load_codecs()
-        self._reserved_placeholder_values = []
+        self.logger = Logger.initialize(app_name, "%(message)s", log_level)
+        # Codecs are imported on first use since most snippets only use a few of them (if any).
+        self.codecs = _LazyCodecs(self.codec_paths, self.logger)
+        self._reserved_placeholder_values = None
+        # The profile is loaded on first use (see _get_profile).
+        self._profile = None
+        self._profile_loaded = False
+
+    def _get_profile(self):
+        if not self._profile_loaded:
+            self._profile = self._load_profile()
+            self._profile_loaded = True
+        return self._profile
 
     def _load_profile(self):
         for profile_path in self.paths:
             profile_file = safe_join_path(profile_path, "snippet_profile" + ".py")
             if os.path.exists(profile_file):
                 try:
-                    self.logger.debug("Loading profile at {} ...".format(profile_path))
+                    self.logger.debug("Loading profile at %s ...", profile_path)
                     # Since the path may contain special characters which can not be processed by the __import__
                     # function we temporarily add the path in which the profile.py is located to the PATH.
                     sys.path.append(profile_path)
@@ -32,32 +98,9 @@ class Config(object):
                     sys.path.pop()
                     return profile
                 except:
-                    self.logger.warning("Loading profile at {} failed!".format(profile_path))
+                    self.logger.warning("Loading profile at %s failed!", profile_path)
         return None
 
-    def _load_codecs(self):
-
-        codecs = {}
-        for codec_path in self.codec_paths:
-            # Since the path may contain special characters which can not be processed by the __import__
-            # function we temporarily add the path in which the codecs are located to the PATH.
-            if os.path.exists(codec_path):
-                sys.path.append(codec_path)
-                filepath = codec_path
-                for r, d, f in os.walk(filepath):
-                    for file in f:
-                        filename, ext = os.path.splitext(file)
-                        if ext == ".py":
-                            try:
-                                self.logger.debug("Loading codec {} at {}...".format(filename, filepath))
-                                codecs[filename] = getattr(__import__(filename), "Codec")()
-                            except Exception as err:
-                                self.logger.warning("Loading codec {} failed!".format(filename))
-                                self.logger.exception(err)
-                sys.path.pop()
-
-        return codecs
-
     def _get_template_file(self, format_template_name):
         if not format_template_name:
             return None
@@ -85,43 +128,59 @@ class Config(object):
             yield reserved_placeholder.name
 
     def get_reserved_placeholder_values(self):
-        if self._reserved_placeholder_values:
-            return dict(self._reserved_placeholder_values)
-
-        self._reserved_placeholder_values = Data()
-        if self.profile:
-            for placeholder_value in self.profile.placeholder_values:
-                placeholder_name = placeholder_value.name
-                self._reserved_placeholder_values.append(placeholder_name, placeholder_value.element())
+        if self._reserved_placeholder_values is None:
+            reserved_placeholder_values = Data()
+            if self.profile:
+                for placeholder_value in self.profile.placeholder_values:
+                    placeholder_name = placeholder_value.name
+                    reserved_placeholder_values.append(placeholder_name, placeholder_value.element())
+            # The values are computed only once. All callers share the same read-only mapping.
+            self._reserved_placeholder_values = types.MappingProxyType(dict(reserved_placeholder_values))
 
-        return dict(self._reserved_placeholder_values)
+        return self._reserved_placeholder_values
 
     def get_format_template_names(self):
-        format_template_files = []
+        format_template_files = set()
         # Get templates from home or app directory.
         for format_template_file_path in self.format_template_paths:
             if os.path.exists(format_template_file_path):
-                exclude_extensions = ['.txt', '.md']
-                exclude_directories = ['.git']
-                for r, d, f in os.walk(format_template_file_path):
-                    d[:] = [dir for dir in d if dir not in exclude_directories]
-                    relpath = r[len(format_template_file_path) + 1:]
-                    for file in f:
-                        if list(filter(lambda x: file.lower().endswith(x), exclude_extensions)):
-                            continue
-                        format_template_files.append(safe_join_path(relpath, file))
+                format_template_files.update(self._iter_format_template_files(format_template_file_path))
 
         # Also consider files in the local directory which ends with .snippet.
         for file in os.listdir(os.fsencode(os.getcwd())):
             filename = os.fsdecode(file)
             if os.path.isfile(filename) and filename.endswith(".snippet"):
-                format_template_files.append(filename)
+                format_template_files.add(filename)
+
+        return sorted(format_template_files)
 
-        return sorted(list(set(format_template_files)))
+    def _iter_format_template_files(self, path, relpath=""):
+        """ Yields the format template files within the path and its subdirectories relative to the path. """
+        exclude_extensions = ('.txt', '.md')
+        exclude_directories = ('.git',)
+        try:
+            with os.scandir(path) as entries:
+                entries = list(entries)
+        except OSError:
+            return
+
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                # Do not follow symbolic links to directories.
+                if entry.name not in exclude_directories and not entry.is_symlink():
+                    yield from self._iter_format_template_files(entry.path, os.path.join(relpath, entry.name))
+            elif not entry.name.lower().endswith(exclude_extensions):
+                yield safe_join_path(relpath, entry.name)
 
     def get_format_template(self, format_template_name):
         format_template_file = self._get_template_file(format_template_name)
         if not format_template_file:
+            # Only import iterfzf when the user actually needs to select a template.
+            from iterfzf import iterfzf
             format_template_name = iterfzf(self.get_format_template_names(), query=format_template_name)
 
         format_template_file = self._get_template_file(format_template_name)
@@ -130,11 +189,9 @@ class Config(object):
 
         try:
             with open(format_template_file) as f:
-                lines = []
-                for line in f.read().splitlines():
-                    lines.append(line)
-                return format_template_name, os.linesep.join(lines)
+                return format_template_name, os.linesep.join(f.read().splitlines())
         except:
             raise Exception("Loading {} failed! Invalid template format!".format(format_template_name or "template"))
 
+    profile = property(_get_profile)
     editor = property(_get_editor)
\ No newline at end of file
@@ -1,4 +1,6 @@
-from collections import OrderedDict
+import copy
+import re
+from functools import lru_cache
 
 from colorama import Fore
 
@@ -6,50 +8,76 @@ from snippet.parsers import PlaceholderFormatParser
 from snippet.utils import colorize
 
 
+@lru_cache(maxsize=8)
+def _escaped_bracket_patterns(opener, closer):
+    """ Returns the compiled pattern and the tables used to encode and decode escaped brackets. """
+    encode_map = {opener: chr(14), closer: chr(15)}
+    decode_table = str.maketrans({chr(14): '\\' + opener, chr(15): '\\' + closer})
+    return re.compile(r'\\([' + re.escape(opener + closer) + '])'), encode_map, decode_table
+
+
 class EscapedBracketCodec:
 
     @staticmethod
     def encode(str, opener, closer):
-        return str.replace('\\' + opener, chr(14)).replace('\\' + closer, chr(15))
+        if "\\" not in str:
+            # Nothing is escaped.
+            return str
+        pattern, encode_map, _ = _escaped_bracket_patterns(opener, closer)
+        return pattern.sub(lambda m: encode_map[m.group(1)], str)
 
     @staticmethod
     def decode(str, opener, closer):
-        return str.replace(chr(14), '\\' + opener).replace(chr(15), '\\' + closer)
+        if "\x0e" not in str and "\x0f" not in str:
+            # Nothing was encoded.
+            return str
+        _, _, decode_table = _escaped_bracket_patterns(opener, closer)
+        return str.translate(decode_table)
+
+
+def _unique_placeholders(placeholders):
+    """
+    Returns the length of the longest placeholder name and a list of unique placeholders while preserving the
+    required and default attribute.
+    """
+    max_len = 0
+    result = {}
+    for placeholder in placeholders:
+        max_len = max(max_len, len(placeholder.name))
+        unique = result.get(placeholder.name)
+        if unique is None:
+            # Work on a copy to not alter the placeholders of the caller.
+            result[placeholder.name] = copy.copy(placeholder)
+        else:
+            unique.required = unique.required or placeholder.required
+            unique.default = unique.default or placeholder.default
+    return max_len, list(result.values())
+
+
+@lru_cache(maxsize=64)
+def _parse_unique_placeholders(format_string):
+    """ Parses the format string and returns the result of _unique_placeholders. Memoized per format string. """
+    return _unique_placeholders(PlaceholderFormatParser.parse(format_string))
 
 
 class PlaceholderValuePrintFormatter:
 
     @staticmethod
     def build(format_string, data_frame):
-
-        def _unique_placeholders(placeholders):
-            """ Returns a list of unique placeholders while preserving the required and default attribute. """
-            result = {}
-            for placeholder in placeholders:
-                if placeholder.name not in result:
-                    result[placeholder.name] = placeholder
-                result[placeholder.name].required = result[placeholder.name].required or placeholder.required
-                result[placeholder.name].default = result[placeholder.name].default or placeholder.default
-            return result.values()
-
         lines = []
-        placeholders = PlaceholderFormatParser().parse(format_string)
-        if not placeholders:
+        placeholder_name_max_len, unique_placeholders = _parse_unique_placeholders(format_string)
+        if not unique_placeholders:
             # No placeholders in format string.
             return lines
 
-        placeholder_names = OrderedDict.fromkeys([placeholder.name for placeholder in placeholders])
-        placeholder_name_max_len = len(max(placeholder_names, key=len))
-        unique_placeholders = _unique_placeholders(placeholders)
-
         # Print assigned values for each placeholder.
         lines.append(colorize("Placeholders:", Fore.YELLOW))
         for placeholder in unique_placeholders:
             # Retrieve values.
             if placeholder.name in data_frame:
-                values = list(OrderedDict.fromkeys(data_frame[placeholder.name]))
+                values = list(dict.fromkeys(data_frame[placeholder.name]))
             elif placeholder.name + "..." in data_frame:
-                values = list(OrderedDict.fromkeys(data_frame[placeholder.name + "..."][0]))
+                values = list(dict.fromkeys(data_frame[placeholder.name + "..."][0]))
             else:
                 values = None
 
@@ -67,7 +95,7 @@ class PlaceholderValuePrintFormatter:
                     value = colorize("<not assigned>", Fore.LIGHTGREEN_EX)
 
                 # No value assigned.
-                lines.append("   {} {} = {}".format(
+                lines.append("   %s %s = %s" % (
                     colorize(placeholder.name.rjust(placeholder_name_max_len), Fore.WHITE), status, value))
             else:
                 # Print list of assigned values.
@@ -76,7 +104,7 @@ class PlaceholderValuePrintFormatter:
                 for i in range(len(values)):
                     placeholder_name = placeholder.name if i == 0 else len(placeholder.name) * " "
                     value = values[i]
-                    lines.append("   {} {} {} {}".format(
+                    lines.append("   %s %s %s %s" % (
                         colorize(placeholder_name.rjust(placeholder_name_max_len), Fore.WHITE),
                         status, "=" if i == 0 else "|", value))
                     if i == 0: status = len("(optional)") * " "  # Show (required/optional) only for the first value.
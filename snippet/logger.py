@@ -1,3 +1,4 @@
+import functools
 import logging
 import sys
 
@@ -15,12 +16,20 @@ def log_method_call():
     """
 
     def decorator(func):
+        logger = None
+
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            logger = Logger.get_instance()
+            nonlocal logger
+            if logger is None:
+                logger = Logger.get_instance()
+            if logger.level > logging.DEBUG:
+                # Do not build the signature when it is not going to be logged anyway.
+                return func(*args, **kwargs)
             args_repr = [repr(a) for a in args]
             kwargs_repr = [f"{k}={v!r}" for k, v in kwargs.items()]
             signature = ", ".join(args_repr + kwargs_repr)
-            logger.debug(f"Calling {func.__name__}({signature})")
+            logger.debug("Calling %s(%s)", func.__name__, signature)
             return func(*args, **kwargs)
 
         return wrapper
@@ -28,6 +37,38 @@ def log_method_call():
     return decorator
 
 
+class _LevelFormatter(logging.Formatter):
+    """ Prepends the colorized label of the log level (e.g. ' INFO: ') to each record which is actually emitted. """
+
+    labels = {
+        logging.DEBUG: ("DEBUG: ", Fore.LIGHTBLACK_EX),
+        logging.INFO: (" INFO: ", Fore.GREEN),
+        logging.WARNING: (" WARN: ", Fore.LIGHTYELLOW_EX),
+        logging.ERROR: ("ERROR: ", Fore.RED),
+    }
+
+    def _get_label(self, record):
+        # Records may overwrite the label of their level (see Logger.error).
+        label = getattr(record, "label", None)
+        if label:
+            return label
+        # Use the label of the nearest known level below (e.g. level 15 is labeled like DEBUG).
+        levels = [level for level in self.labels if level <= record.levelno]
+        if levels:
+            return self.labels[max(levels)]
+        return record.levelname + ": ", None
+
+    def format(self, record):
+        message = super().format(record)
+        label, color = self._get_label(record)
+        if color is None:
+            return label + message
+        if record.levelno == logging.DEBUG:
+            # Debug messages are colorized as a whole.
+            return colorize(label + message, color)
+        return colorize(label, color) + message
+
+
 class Logger:
 
     # Static logger instance
@@ -49,7 +90,7 @@ class Logger:
     def __init__(self, app_id, log_format, level):
         self.logger = logging.getLogger(app_id)
         self.handler = logging.StreamHandler(sys.stderr)
-        self.handler.setFormatter(logging.Formatter(log_format))
+        self.handler.setFormatter(_LevelFormatter(log_format))
         self.logger.addHandler(self.handler)
         self._set_level(level)
 
@@ -60,16 +101,26 @@ class Logger:
     def _get_level(self):
         return self.logger.level
 
-    def info(self, message):
-        self.logger.info(colorize(" INFO: ", Fore.GREEN) + message)
+    def is_enabled_for(self, level):
+        return self.logger.isEnabledFor(level)
+
+    def info(self, message, *args):
+        self.logger.info(message, *args)
+
+    def info_lines(self, messages):
+        """ Logs several info messages as a single record, so that they are written to the stream at once. """
+        # The formatter only labels the first line of a record.
+        label, color = _LevelFormatter.labels[logging.INFO]
+        self.logger.info(("\n" + colorize(label, color)).join(messages))
 
-    def debug(self, message):
-        self.logger.debug(colorize("DEBUG: {}".format(message), Fore.LIGHTBLACK_EX))
+    def debug(self, message, *args):
+        self.logger.debug(message, *args)
 
-    def warning(self, message):
-        self.logger.warning(colorize(" WARN: ", Fore.LIGHTYELLOW_EX) + message)
+    def warning(self, message, *args):
+        self.logger.warning(message, *args)
 
-    def error(self, message):
-        self.logger.info(colorize("ERROR: ", Fore.RED) + message)
+    def error(self, message, *args):
+        # Errors are logged with level INFO so that they are not shown in quiet mode.
+        self.logger.info(message, *args, extra={"label": _LevelFormatter.labels[logging.ERROR]})
 
     level = property(fset=_set_level, fget=_get_level)
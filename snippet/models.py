@@ -1,8 +1,13 @@
 import json
+import re
 import shlex
+import sys
 from collections import namedtuple, defaultdict
 
 
+_VALUE_LIST_RE = re.compile(r"\\\((.*)\\\)", re.DOTALL)
+
+
 class PlaceholderFormat:
     """ An object representation of a placeholder. """
 
@@ -11,17 +16,22 @@ class PlaceholderFormat:
     def __init__(self, format_string: str, required):
         try:
             data, self.start, self.end = format_string
-            self.name = data.get("name").lower()  # Required
+            self.name = sys.intern(data.get("name").lower())  # Required
             self.codecs = [
                 PlaceholderFormat.Codec(codec[0].lower(), codec[1:]) for codec in data.get("codecs", [])]  # Optional
+            # Hashable representation of the codecs which is used for caching their results.
+            self.codec_key = tuple((codec.name, tuple(codec.arguments)) for codec in self.codecs)
             self.default = data.get("default")  # Optional
             self.repeatable = "repeatable" in data  # True or False
+            # The key under which the values of this placeholder are stored in the data frame.
+            self.data_key = self.name + "..." if self.repeatable else self.name
             self.required = required  # True or False
         except Exception:
             raise Exception("Transforming placeholders failed! Invalid format!")
 
     def __str__(self):
-        return json.dumps(self.__dict__)
+        # The codec key is derived from the codecs and therefore left out.
+        return json.dumps({key: value for key, value in self.__dict__.items() if key != "codec_key"})
 
 
 class Data(defaultdict):
@@ -31,26 +41,30 @@ class Data(defaultdict):
         super().__init__(list)
 
     def append(self, placeholder, values):
-        placeholder_key = placeholder.lower()
-        if isinstance(values, list):
-            for value in values:
-                self[placeholder_key].append(value)
-        else:
-            if values.startswith('\\(') and values.endswith('\\)'):
-                for value in shlex.split(values[2:-2]):
-                    self[placeholder_key].append(value)
-            else:
+        placeholder_key = sys.intern(placeholder.lower())
+        if not isinstance(values, list):
+            value_list = _VALUE_LIST_RE.fullmatch(values)
+            if not value_list:
                 self[placeholder_key].append(values)
+                return
+            # A list of values e.g. \(a b "c d"\)
+            values = shlex.split(value_list.group(1))
+
+        if values:
+            # Do not add the placeholder when there are no values at all.
+            self[placeholder_key].extend(values)
+
+    def bulk_set(self, items):
+        """ Sets the value lists of several placeholders at once e.g. [('PLACEHOLDER-1', ('a','b','c')), ...]. """
+        self.update((placeholder.lower(), list(values)) for placeholder, values in items)
 
     def to_data_frame(self):
         # Create table data with equally sized lists by filling them with empty strings
         # e.g. { 'placeholder-1': ('a','b','c'), 'placeholder-2': ('d','','') }
         table_data = Data()
-        max_length = max([len(self[key]) for key in self.keys()])
-        for placeholder in self.keys():
-            for item in self[placeholder]:
-                table_data.append(placeholder, item)
-            for i in range(0, max_length - len(self[placeholder])):
-                table_data.append(placeholder, "")
+        max_length = max(map(len, self.values()), default=0)
+        for placeholder, values in self.items():
+            column = table_data.setdefault(placeholder.lower(), list(values))
+            column.extend([""] * (max_length - len(column)))
 
         return table_data
\ No newline at end of file
@@ -1,8 +1,7 @@
+import logging
 import os
 import re
-from collections import OrderedDict
-
-import pyparsing as pp
+from functools import lru_cache
 
 from snippet.models import Data, PlaceholderFormat
 
@@ -20,6 +19,8 @@ class ArgumentFormatParser:
     *) optional parts are denoted with square brackets and parts which can be repeated are marked with three dots.
     """
 
+    _argument_format = re.compile(r"(?:(\w+)([=:]))?(.*)")
+
     def parse(self, format_argument: str) -> dict:
         """
         Parses the argument and adds it into a dict with it's placeholder name and the associated values.
@@ -28,7 +29,7 @@ class ArgumentFormatParser:
         :return: a dict with placeholders and a list of values (e.g. {'': ['a b']}, {'ARG1': ['a b']},
                  {'ARG2': ['line1', 'line2'] }).
         """
-        placeholder, separator, value = re.findall(r"(?:(\w+)([=:]))?(.*)", format_argument).pop(0)
+        placeholder, separator, value = self._argument_format.match(format_argument).groups("")
         return {
             "=": self._parse_placeholder_value,
             ":": self._parse_placeholder_file,
@@ -61,35 +62,44 @@ class ArgumentFormatParser:
 class PlaceholderFormatParser:
     """ Parses a format string into a list of placeholders. """
 
-    # A set of tokens
-    LT, GT, EQ, PIPE, COLON = map(pp.Suppress, "<>=|:")
-
     # A quoted string. Nothing special about that
-    quoted_string = pp.QuotedString('\'') | pp.QuotedString('"')
+    quoted_string = "|".join([r"'[^'\n\r]*'", r'"[^"\n\r]*"'])
 
     # Defines how a placeholder name or codec name should look like
-    name = pp.Word(pp.alphas, pp.alphanums + "_")
+    name = r"[A-Za-z][A-Za-z0-9_]*"
 
     # Defines how a placeholder can be marked as repeatable
-    repeatable = pp.Combine("...").setResultsName("repeatable")
+    repeatable = r"\.\.\."
 
     # Defines how codecs and their arguments can be specified
-    codecs = pp.ZeroOrMore(pp.Group(PIPE + (name + pp.ZeroOrMore(COLON + quoted_string)))).setResultsName("codecs")
+    codecs = r"(?:\|{name}(?::(?:{quoted_string}))*)*".format(name=name, quoted_string=quoted_string)
 
     # Defines how a default value can be specified
-    default = pp.Combine(EQ + quoted_string).setResultsName("default")
+    default = r"=(?P<default>{quoted_string})".format(quoted_string=quoted_string)
+
+    # Defines how a placeholder format should look like. Escaped angle brackets (e.g. \<) do not start a placeholder.
+    placeholder_format = re.compile(
+        r"(?<!\\)<(?P<name>{name})(?P<repeatable>{repeatable})?(?P<codecs>{codecs})(?:{default})?>".format(
+            name=name, repeatable=repeatable, codecs=codecs, default=default))
+
+    # Splits the codecs of a placeholder (e.g. "|join:','|b64") into their names and arguments
+    codec_tokens = re.compile(r"\|(?P<name>{name})|:(?P<argument>{quoted_string})".format(
+        name=name, quoted_string=quoted_string))
 
-    # Defines how a placeholder format should look like
-    placeholder_format = pp.Combine(
-        LT + \
-        name.setResultsName("name").leaveWhitespace() + \
-        pp.Optional(repeatable).leaveWhitespace() + \
-        pp.Optional(codecs).leaveWhitespace() + \
-        pp.Optional(default).leaveWhitespace() + \
-        GT
-    )
+    # Escaped whitespace characters within quoted strings (e.g. "\t") are converted into the real character
+    whitespace_escapes = re.compile(r"\\[tnfr]")
+    whitespace_escape_map = {r"\t": "\t", r"\n": "\n", r"\f": "\f", r"\r": "\r"}
 
-    def parse(self, format_string, opener="<", closer=">") -> list:
+    @staticmethod
+    def parse(format_string) -> list:
+        """
+        Returns the placeholders of the format string. Since the results are shared between calls the placeholders
+        must not be altered.
+        """
+        return list(_parse_placeholders(format_string))
+
+    @staticmethod
+    def _parse(format_string) -> list:
 
         def _parse_parts(parts, i=0) -> list:
             result = []
@@ -103,14 +113,43 @@ class PlaceholderFormatParser:
             return result
 
         def _parse_part(part, i) -> list:
-            from snippet.formatters import EscapedBracketCodec
-            return list(
-                OrderedDict.fromkeys(
-                    PlaceholderFormat(placeholder_format, i == 0)
-                    for placeholder_format in self.placeholder_format.scanString(
-                        EscapedBracketCodec.encode(part, opener, closer) or "")))
+            return [PlaceholderFormat(placeholder_format, i == 0)
+                    for placeholder_format in _scan_placeholder_formats(part)]
+
+        return _parse_parts(ParenthesesParser.parse(format_string))
+
+    @staticmethod
+    def _unquote(quoted_string):
+        return PlaceholderFormatParser.whitespace_escapes.sub(
+            lambda match: PlaceholderFormatParser.whitespace_escape_map[match.group()], quoted_string[1:-1])
 
-        return _parse_parts(ParenthesesParser().parse(format_string))
+    @staticmethod
+    def _scan(string):
+        """ Yields the data, start and end position of each placeholder found in the string. """
+        for match in PlaceholderFormatParser.placeholder_format.finditer(string):
+            data = {"name": match.group("name"), "codecs": []}
+            for token in PlaceholderFormatParser.codec_tokens.finditer(match.group("codecs")):
+                if token.group("name"):
+                    data["codecs"].append([token.group("name")])
+                else:
+                    data["codecs"][-1].append(PlaceholderFormatParser._unquote(token.group("argument")))
+            if match.group("default") is not None:
+                data["default"] = PlaceholderFormatParser._unquote(match.group("default"))
+            if match.group("repeatable"):
+                data["repeatable"] = True
+            yield data, match.start(), match.end()
+
+
+@lru_cache(maxsize=1024)
+def _parse_placeholders(format_string) -> tuple:
+    """ Parses a format string into placeholders. Cached since the same strings are parsed for every line and build. """
+    return tuple(PlaceholderFormatParser._parse(format_string))
+
+
+@lru_cache(maxsize=256)
+def _scan_placeholder_formats(string) -> tuple:
+    """ Scans a string for placeholders. Cached since the same parts of a format string are scanned several times. """
+    return tuple(PlaceholderFormatParser._scan(string))
 
 
 class ParenthesesParser:
@@ -123,36 +162,49 @@ class ParenthesesParser:
 
     """
 
-    def parse(self, format_string, opener="[", closer="]") -> list:
+    @staticmethod
+    def parse(format_string, opener="[", closer="]") -> list:
         from snippet.formatters import EscapedBracketCodec
 
-        def _parse_parentheses(format_string, i=0, balance=0):
-            components = []
-            start = i
-            while i < len(format_string):
-                c = format_string[i]
-                if c == opener:
-                    if i > 0:
-                        components.append(EscapedBracketCodec.decode(format_string[start:i], opener, closer))
-                    i, result = _parse_parentheses(format_string, i + 1, balance + 1)
-                    components.append(result)
-                    start = i + 1
-                elif c == closer:
-                    balance = balance - 1
-                    components.append(EscapedBracketCodec.decode(format_string[start:i], opener, closer))
-                    if balance < 0:
+        def _decode(string):
+            return EscapedBracketCodec.decode(string, opener, closer) if string else string
+
+        def _parse_parentheses(format_string):
+            # Jump from bracket to bracket instead of inspecting every character. Nested parts are tracked using a
+            # stack of component lists. The first list holds the top-level components.
+            stack = [[]]
+            start = 0
+            while True:
+                opener_index = format_string.find(opener, start)
+                closer_index = format_string.find(closer, start)
+                if opener_index == -1 and closer_index == -1:
+                    break
+                if closer_index == -1 or -1 < opener_index < closer_index:
+                    if opener_index > 0:
+                        stack[-1].append(_decode(format_string[start:opener_index]))
+                    components = []
+                    stack[-1].append(components)
+                    stack.append(components)
+                    start = opener_index + 1
+                else:
+                    stack[-1].append(_decode(format_string[start:closer_index]))
+                    if len(stack) == 1:
                         raise Exception("Unbalanced parentheses!")
-                    return i, components
-                i = i + 1
+                    stack.pop()
+                    start = closer_index + 1
 
-            components.append(EscapedBracketCodec.decode(format_string[start:len(format_string)], opener, closer))
-            return i, components
+            stack[-1].append(_decode(format_string[start:]))
+            # Parts which are not closed end with the format string. Each enclosing part ends with an empty string.
+            while len(stack) > 1:
+                stack.pop()
+                stack[-1].append('')
+            return stack[0]
 
         # Parts enclosed by square brackets (e.g. "<arg1> [<arg2>] <arg3>") are considered optional.
         # Since our parser can not differentiate between user-specified square brackets and those used for specifying
         # optional parts, the user needs to escape them (e.g. \[ or \]). To make parsing easier we encode escaped
         # square brackets here.
-        return _parse_parentheses(EscapedBracketCodec.encode(format_string, opener, closer))[1]
+        return _parse_parentheses(EscapedBracketCodec.encode(format_string, opener, closer))
 
 
 class FormatStringParser:
@@ -206,60 +258,87 @@ class FormatStringParser:
         :param arguments: a dictionary with argument names as key and booleans as value.
                           The boolean value specifies whether the argument is non-empty (True = non-empty).
         """
+        if self._logger.is_enabled_for(logging.DEBUG):
+            # Do not use the cache so that the reasons for removing optional parts are logged on every build.
+            return FormatStringParser._parse(format_string, arguments, self._logger)
+        return _minify_format_string(format_string, frozenset(arguments.items()), self._logger)
+
+    @staticmethod
+    def _parse(format_string, arguments, logger):
         lines = []
         for line in format_string.splitlines():
             if line.startswith("#"):
                 lines.append(line)
                 continue
 
-            parentheses = ParenthesesParser().parse(line)
+            if "[" in line or "]" in line:
+                parentheses = ParenthesesParser.parse(line)
+            else:
+                # Lines without square brackets do not have any optional parts.
+                parentheses = [line]
             if not parentheses:
-                self._logger.debug("No optional arguments found in format string.")
+                logger.debug("No optional arguments found in format string.")
                 lines.append(format_string)
                 continue
 
-            essentials = self._remove_optionals(parentheses, arguments)
+            essentials = FormatStringParser._remove_optionals(parentheses, arguments, logger)
             if not essentials:
-                self._logger.debug("Not all essential arguments are set.")
+                logger.debug("Not all essential arguments are set.")
                 lines.append(format_string)
                 continue
 
-            lines.append("".join(self._flatten_list(essentials)))
+            lines.append("".join(FormatStringParser._flatten_list(essentials)))
 
         return os.linesep.join(lines)
 
-    def _remove_optionals(self, parts, arguments, required=True):
+    @staticmethod
+    def _remove_optionals(parts, arguments, logger, required=True):
         result = []
         for part in parts:
             if isinstance(part, str):
-                placeholders = PlaceholderFormatParser().parse(part)
+                placeholders = PlaceholderFormatParser.parse(part)
                 for placeholder in placeholders:
                     not_defined = placeholder.name not in arguments and not placeholder.default
                     if not_defined:
                         # Ignore argument if it is not defined nor a default value is set.
                         # $ snippet -f  "<arg>"             # ignore
                         # $ snippet -f  "<arg='default'>"   # do not ignore
-                        self._logger.debug("{}: No argument defined.".format(placeholder.name))
+                        logger.debug("%s: No argument defined.", placeholder.name)
                         return []
                     has_empty_argument = placeholder.name in arguments and not arguments[placeholder.name]
                     if has_empty_argument and not required:
                         # Ignore argument if it is empty and optional.
                         # $ snippet -f "a[<arg>]b" arg=
-                        self._logger.debug("{}: Empty argument supplied and optional.".format(placeholder.name))
+                        logger.debug("%s: Empty argument supplied and optional.", placeholder.name)
                         return []
                 result.append(part)
             elif isinstance(part, list):
                 # The first list of parts is required. Everything beyond is optional.
                 # $ snippet -f "a<arg>b[c<arg>d]" arg=
-                result.append(self._remove_optionals(part, arguments, required=False))
+                result.append(FormatStringParser._remove_optionals(part, arguments, logger, required=False))
         return result
 
-    def _flatten_list(self, lst):
+    @staticmethod
+    def _flatten_list(lst):
         result = []
-        for item in lst:
-            if isinstance(item, str):
-                result.append(item)
-            elif isinstance(item, list):
-                for i in self._flatten_list(item):
-                    result.append(i)
+        # Walk the nested lists using a stack of iterators instead of recursion.
+        stack = [iter(lst)]
+        while stack:
+            for item in stack[-1]:
+                if isinstance(item, str):
+                    result.append(item)
+                elif isinstance(item, list):
+                    stack.append(iter(item))
+                    break
+            else:
+                stack.pop()
         return result
+
+
+@lru_cache(maxsize=256)
+def _minify_format_string(format_string, arguments, logger) -> str:
+    """
+    Minifies a format string with the arguments given as frozenset of (name, non-empty) pairs. Cached since the same
+    format string is minified with the same arguments on every build.
+    """
+    return FormatStringParser._parse(format_string, dict(arguments), logger)
@@ -1,29 +1,41 @@
-import copy
+import bisect
+import functools
 import itertools
-import os
+import logging
+import operator
 import re
-from collections import OrderedDict
+from collections import defaultdict
 
 from snippet.codecs import CodecRunner
 from snippet.formatters import PlaceholderValuePrintFormatter
 from snippet.models import Data
 from snippet.parsers import FormatStringParser, PlaceholderFormatParser
-from snippet.utils import replace_within
 
 
 class DataBuilder(object):
 
+    _ESCAPE_TABLE = str.maketrans({"[": "\\[", "]": "\\]", "<": "\\<", ">": "\\>"})
+    _UNESCAPE_RE = re.compile(r"\\([\[\]<>])")
+
     def __init__(self, format_string, data, codec_formats, config):
         self.data = data
         self.config = config
         self.codec_formats = codec_formats
         self._codec_runner = CodecRunner(config.codecs)
+        self._codec_cache = {}
+        self._reserved_placeholder_names = list(config.get_reserved_placeholder_names())
+        self._reserved_placeholder_values = config.get_reserved_placeholder_values()
         self._format_string = format_string
+        self._format_string_no_comments = self._remove_comments(format_string)
         self._format_string_minified = self._minify_format_string(format_string)
-        self._placeholders = PlaceholderFormatParser().parse(self._remove_comments(self._format_string_minified))
+        self._placeholders = PlaceholderFormatParser.parse(self._remove_comments(self._format_string_minified))
+        self._placeholder_names = set([placeholder.name for placeholder in self._placeholders])
 
     def _remove_comments(self, string):
-        return os.linesep.join([line for line in string.splitlines() if not line.startswith("#")])
+        if "#" not in string:
+            return string
+        # Comment lines are dropped together with their line break.
+        return "".join([line for line in string.splitlines(keepends=True) if not line.startswith("#")])
 
     def _minify_format_string(self, format_string):
         """
@@ -33,20 +45,17 @@ class DataBuilder(object):
         snippet system (e.g. reserved placeholders).
         """
         # Collect defaults and set them if no value was assigned.
-        for placeholder in PlaceholderFormatParser().parse(self._remove_comments(format_string)):
-            if placeholder.default is not None and placeholder.name not in self.data.keys():
+        for placeholder in PlaceholderFormatParser.parse(self._format_string_no_comments):
+            if placeholder.default is not None and placeholder.name not in self.data:
                 self.data.append(placeholder.name, placeholder.default)
 
         # Check whether parameters are empty.
-        parameters = {}
-
         # Collect parameters specified by the user.
-        for parameter in self.data.keys():
-            # $ snippet -f "[<arg>]" arg=
-            parameters[parameter] = self.data[parameter] != [""]
+        # $ snippet -f "[<arg>]" arg=
+        parameters = {parameter: values != [""] for parameter, values in self.data.items()}
 
         # Collect reserved placeholders (e.g. <datetime>).
-        for parameter in self.config.get_reserved_placeholder_names():
+        for parameter in self._reserved_placeholder_names:
             parameters[parameter] = True  # is never empty
 
         return FormatStringParser(self.config).parse(format_string, parameters)
@@ -59,89 +68,129 @@ class DataBuilder(object):
 
         # Add all data which has an associated placeholder to a temporary dict.
         placeholder_names = self._get_placeholder_names()
-        for placeholder_name in self.data.keys():
+        for placeholder_name, values in self.data.items():
             if placeholder_name in placeholder_names:
-                temporary_data[placeholder_name] = self.data[placeholder_name]
+                temporary_data[placeholder_name] = values
 
         # Do not allow using reserved placeholders.
-        reserved_placeholder_values = self.config.get_reserved_placeholder_values()
-        if any(reserved_placeholder in temporary_data.keys() for reserved_placeholder in
-               reserved_placeholder_values.keys()):
+        reserved_placeholder_values = self._reserved_placeholder_values
+        collisions = temporary_data.keys() & reserved_placeholder_values.keys()
+        if collisions:
             raise Exception("{} is/are already defined in your profile!".format(
                 ', '.join(["<" + placeholder_name + ">" for placeholder_name in reserved_placeholder_values.keys() if
-                           placeholder_name in temporary_data])))
+                           placeholder_name in collisions])))
 
         # Add all reserved placeholders which have an associated placeholder to the temporary dict.
         for placeholder_name, value in reserved_placeholder_values.items():
             if placeholder_name in placeholder_names:
                 # Add to temporary data. Remove duplicates while preserving order
-                temporary_data[placeholder_name] = OrderedDict.fromkeys(value)
+                temporary_data[placeholder_name] = dict.fromkeys(value)
 
         # Move placeholders which are tagged as repeatable (e.g. <ARG...>) to temporary map before creating matrix.
         repeatable_placeholders = {}
-        placeholder_names = list(temporary_data.keys())
-        for placeholder_name in placeholder_names:
-            # Get all placeholders specified in the format string which have the same name.
-            _p = [p for p in self.get_placeholders() if p.name == placeholder_name]
-            # Get all placeholders specified in the format string which are repeatable and have the same name.
-            _r = [p for p in _p if p.repeatable]
-            is_repeatable = len(_r) > 0
+        # Count the placeholders and the repeatable placeholders of each name e.g. { 'ARG': [2, 1] }
+        placeholder_counts = defaultdict(lambda: [0, 0])
+        for placeholder in self._placeholders:
+            counts = placeholder_counts[placeholder.name]
+            counts[0] += 1
+            counts[1] += placeholder.repeatable
+        for placeholder_name in list(temporary_data.keys()):
+            num_placeholders, num_repeatables = placeholder_counts[placeholder_name]
+            is_repeatable = num_repeatables > 0
             if is_repeatable:
-                if len(_p) == len(_r):
+                if num_placeholders == num_repeatables:
                     # All placeholders in the format string are repeatable placeholders e.g. "<ARG...> <ARG...>"
-                    repeatable_placeholders[placeholder_name] = temporary_data.pop(placeholder_name, None)
+                    repeatable_placeholders[placeholder_name] = list(temporary_data.pop(placeholder_name))
                 else:
                     # Not repeatable and repeatable placeholders are defined in format string e.g. "<ARG...> <ARG>"
-                    repeatable_placeholders[placeholder_name] = copy.deepcopy(temporary_data[placeholder_name])
+                    repeatable_placeholders[placeholder_name] = list(temporary_data[placeholder_name])
 
-        # Create matrix from data e.g. (('a','d'), ('b','d'), ('c','d'))
-        # This list does only contain placeholders which are not tagged as repeatable (e.g. <ARG...>).
-        data_matrix = list(itertools.product(*[temporary_data[key] for key in temporary_data.keys()]))
+        # Create columns from the matrix of data e.g. (('a','b','c'), ('d','d','d'))
+        # The matrix does only contain placeholders which are not tagged as repeatable (e.g. <ARG...>).
+        data_keys = list(temporary_data.keys())
+        value_lists = [temporary_data[key] for key in data_keys]
+        # The product of no placeholders still yields a single (empty) row.
+        num_rows = functools.reduce(operator.mul, map(len, value_lists), 1)
+        columns = self._create_columns(value_lists, num_rows)
 
-        # Create table data from matrix e.g. { 'placeholder-1': ('a','b','c'), 'placeholder-2': ('d','d','d') }
+        # Create table data from columns e.g. { 'placeholder-1': ('a','b','c'), 'placeholder-2': ('d','d','d') }
         # Add placeholders which are tagged as repeatable (e.g. <ARG...>) to the table data again.
-        data_keys = list(temporary_data.keys())
         table_data = Data()
-        for i in range(0, len(data_matrix)):
-            for j in range(0, len(data_keys)):
-                table_data.append(data_keys[j], data_matrix[i][j])
-            for placeholder_name in repeatable_placeholders:
-                # Store repeatable placeholder in table_data as list.
-                # Use different key to avoid overwriting placeholders which is not repeatable.
-                table_data.append(placeholder_name + "...",
-                                  [[item for item in repeatable_placeholders[placeholder_name]]])
+        if not num_rows:
+            return table_data
+
+        table_data.bulk_set(zip(data_keys, columns))
+        # Store repeatable placeholder in table_data as list.
+        # Use different key to avoid overwriting placeholders which is not repeatable.
+        table_data.bulk_set((placeholder_name + "...", [values] * num_rows)
+                            for placeholder_name, values in repeatable_placeholders.items())
 
         return table_data
 
+    @staticmethod
+    def _create_columns(value_lists, num_rows):
+        """
+        Creates the columns of the cartesian product of the value lists e.g. (('a','b'), ('c')) => (('a','b'), ('c','c'))
+        """
+        if num_rows <= 64:
+            return list(zip(*itertools.product(*value_lists)))
+
+        # Compute the columns directly instead of creating every row first. Each value is repeated for all combinations
+        # of the following value lists. The resulting block is repeated for all combinations of the preceding ones.
+        columns = []
+        block_size = num_rows
+        for values in value_lists:
+            block_size //= len(values)
+            block = list(itertools.chain.from_iterable(itertools.repeat(value, block_size) for value in values))
+            columns.append(block * (num_rows // len(block)))
+        return columns
+
     def get_placeholders(self):
         return list(self._placeholders)
 
     def _get_placeholder_names(self):
         """ Returns a unique list of placeholder names. """
-        return set([placeholder.name for placeholder in self.get_placeholders()])
+        return self._placeholder_names
 
     def _escape_brackets(self, str):
         if str:
-            return str.replace("[", "\\[").replace("]", "\\]").replace("<", "\\<").replace(">", "\\>")
+            return str.translate(self._ESCAPE_TABLE)
         else:
             return str
 
     def _unescape_brackets(self, str):
-        if str:
-            return str.replace("\\[", "[").replace("\\]", "]").replace("\\<", "<").replace("\\>", ">")
+        # Most lines do not contain any escaped brackets and can be returned without running the regex.
+        if str and "\\" in str:
+            return self._UNESCAPE_RE.sub(r"\1", str)
         else:
             return str
 
-    def _replace_placeholders_in_line(self, line, placeholders, data_frame, line_start, line_end, iteration):
-        for placeholder in reversed(placeholders):
-            if line_start <= placeholder.start < line_end:
-                adjusted_start = placeholder.start - line_start
-                adjusted_end = placeholder.end - line_start
-                row = data_frame[placeholder.name + "..." if placeholder.repeatable else placeholder.name]
-                value = self._codec_runner.run(row[iteration], placeholder)
-                line = replace_within(line, self._escape_brackets(value), adjusted_start, adjusted_end)
+    def _run_codecs(self, row_item, placeholder):
+        """ Applies the codecs of the placeholder to the value. Results are cached since values often repeat. """
+        if not placeholder.codecs:
+            # Nothing to run. Repeatables are joined like the codec runner does.
+            return " ".join(row_item) if isinstance(row_item, list) else row_item
+        key = (placeholder.codec_key, tuple(row_item) if isinstance(row_item, list) else row_item)
+        if key not in self._codec_cache:
+            self._codec_cache[key] = self._codec_runner.run(row_item, placeholder)
+        return self._codec_cache[key]
+
+    def _group_placeholders_by_line(self, placeholders, line_offsets):
+        """ Returns the placeholders of each line sorted by their position. """
+        placeholders_by_line = [[] for _ in line_offsets]
+        line_indexes = [index for index, (_, _, is_comment) in enumerate(line_offsets) if not is_comment]
+        line_starts = [line_offsets[index][0] for index in line_indexes]
+        for placeholder in placeholders:
+            position = bisect.bisect_right(line_starts, placeholder.start) - 1
+            if position < 0:
+                continue
+            line_index = line_indexes[position]
+            if placeholder.start < line_offsets[line_index][1]:
+                placeholders_by_line[line_index].append(placeholder)
 
-        return line
+        for line_placeholders in placeholders_by_line:
+            line_placeholders.sort(key=lambda placeholder: placeholder.start)
+        return placeholders_by_line
 
     def _process_format_string(self, format_string, data_frame, placeholders):
         result = []
@@ -159,46 +208,74 @@ class DataBuilder(object):
         # Processing format_string multiple times for each set of values in data_frame:
         # Example 1: snippet -f "<arg>" arg=1 -> Output: "1"
         # Example 2: snippet -f "<arg>" arg=1 arg=2 -> Outputs: "1", "2"
+        template, template_placeholders = self._compile_template(format_string, placeholders)
+        placeholder_rows = [(placeholder, data_frame[placeholder.data_key]) for placeholder in template_placeholders]
+        escape_brackets, run_codecs = self._escape_brackets, self._run_codecs
         for iteration in range(num_iterations):
-            line_start = 0
-            processed_lines = []
-
-            # Iterate over each line in format_string for processing
-            for line in format_string.splitlines(keepends=True):
-                if not line.startswith("#"):
-                    # Replace placeholders in non-comment lines
-                    line_end = line_start + len(line)
-                    line = self._replace_placeholders_in_line(line, placeholders, data_frame, line_start, line_end, iteration)
-                    line_start = line_end
-
-                processed_lines.append(line)
-
-            result.append(''.join(processed_lines))
+            result.append(template.format(*[escape_brackets(run_codecs(row[iteration], placeholder))
+                                            for placeholder, row in placeholder_rows]))
 
         return result
 
-    def _validate_codecs(self, placeholders):
+    def _compile_template(self, format_string, placeholders):
+        """
+        Turns the format string into a template for str.format() by replacing each placeholder with a numbered field.
+
+        :return: the template and the placeholders in the order of their fields.
+        """
+        # Comment lines were removed before parsing the placeholders, hence they do not count towards the offsets of
+        # the placeholders.
+        lines = format_string.splitlines(keepends=True)
+        line_offsets = []
+        line_start = 0
+        for line in lines:
+            is_comment = line.startswith("#")
+            line_end = line_start if is_comment else line_start + len(line)
+            line_offsets.append((line_start, line_end, is_comment))
+            line_start = line_end
+        placeholders_by_line = self._group_placeholders_by_line(placeholders, line_offsets)
+
+        parts = []
+        template_placeholders = []
+        for index, line in enumerate(lines):
+            line_start = line_offsets[index][0]
+            cursor = 0
+            for placeholder in placeholders_by_line[index]:
+                parts.append(self._escape_template(line[cursor:placeholder.start - line_start]))
+                parts.append("{" + str(len(template_placeholders)) + "}")
+                template_placeholders.append(placeholder)
+                cursor = placeholder.end - line_start
+            parts.append(self._escape_template(line[cursor:]))
+
+        return "".join(parts), template_placeholders
+
+    def _escape_template(self, str):
+        return str.replace("{", "{{").replace("}", "}}")
+
+    def _prepare_placeholders(self, placeholders):
+        """ Assigns the default values of unset placeholders and validates that all codecs exist in a single pass. """
+        codecs, data = self.config.codecs, self.data
         for placeholder in placeholders:
+            if placeholder.name not in data and placeholder.default:
+                data.append(placeholder.name, placeholder.default)
             for codec in placeholder.codecs:
-                if codec.name not in self.config.codecs:
+                if codec.name not in codecs:
                     raise Exception(f"Parsing '{self._format_string}' failed! Codec '{codec.name}' does not exist!")
 
-    def _assign_defaults(self, placeholders):
-        for placeholder in placeholders:
-            if placeholder.name not in self.data.keys() and placeholder.default:
-                self.data.append(placeholder.name, placeholder.default)
-
     def _log_placeholder_values(self, data_frame):
-        for output in PlaceholderValuePrintFormatter.build(self._remove_comments(self._format_string), data_frame):
-            self.config.logger.info(output)
+        if not self.config.logger.is_enabled_for(logging.INFO):
+            return
+        lines = PlaceholderValuePrintFormatter.build(self._format_string_no_comments, data_frame)
+        if lines:
+            self.config.logger.info_lines(lines)
 
     def _validate_required_placeholders(self, placeholders, data_frame):
         # Get all required placeholders which are not assigned. Also consider repeatables (see transform_data).
-        unset_placeholders = OrderedDict.fromkeys([
+        unset_placeholders = dict.fromkeys(
             placeholder.name for placeholder in placeholders
-            if placeholder.name not in data_frame.keys() and
+            if placeholder.name not in data_frame and
                placeholder.required and
-               placeholder.name + "..." not in data_frame.keys()])
+               placeholder.name + "..." not in data_frame)
 
         if unset_placeholders:
             missing_placeholders = ', '.join(f"<{name}>" for name in unset_placeholders)
@@ -207,23 +284,52 @@ class DataBuilder(object):
     def _check_for_unmatched_placeholders(self, processed_output):
         # Check for unmatched placeholders in each output, ignoring comments and escaped angle brackets.
         for output in processed_output:
+            # Removing comments and line breaks can not create new matches. Hence, most outputs can be skipped without
+            # splitting them into lines.
+            start = output.find('<')
+            if start < 0 or output.find('>', start) < 0:
+                continue
+
             output_string = ''.join(line for line in output.splitlines() if not line.startswith('#'))
-            placeholders = re.findall(r"([\\]?<.*?>)", output_string)
-            unescaped_placeholders = [item for item in placeholders if
-                                      not (item.startswith('\\<') and item.endswith('\\>'))]
 
-            if unescaped_placeholders:
-                raise Exception(f"Invalid placeholder format: {unescaped_placeholders[0]}")
+            placeholder = self._find_unmatched_placeholder(output_string)
+            if placeholder is not None:
+                raise Exception(f"Invalid placeholder format: {placeholder}")
+
+    @staticmethod
+    def _find_unmatched_placeholder(string):
+        """
+        Returns the first placeholder (e.g. '<arg>') in the string which is not escaped (e.g. '\\<arg\\>') or None.
+        """
+        position = 0
+        while True:
+            start = string.find('<', position)
+            if start < 0:
+                return None
+            end = string.find('>', start)
+            if end < 0:
+                return None
+            if start > position and string[start - 1] == '\\':
+                # Include the backslash of an escaped opening bracket.
+                start -= 1
+            placeholder = string[start:end + 1]
+            if not (placeholder.startswith('\\<') and placeholder.endswith('\\>')):
+                return placeholder
+            position = end + 1
 
     def build(self):
         if not self._format_string_minified:
             return []
 
-        placeholders = self.get_placeholders()
-        self._assign_defaults(placeholders)
-        self._validate_codecs(placeholders)
+        if not self._placeholders:
+            # Nothing to replace e.g. snippet -f "abc def". There is no data to transform. Still report optional
+            # placeholders which were removed and check for invalid placeholders.
+            placeholders, data_frame = [], Data()
+        else:
+            placeholders = self.get_placeholders()
+            self._prepare_placeholders(placeholders)
+            data_frame = self.transform_data()
 
-        data_frame = self.transform_data()
         self._log_placeholder_values(data_frame)
         self._validate_required_placeholders(placeholders, data_frame)
         processed_output = self._process_format_string(self._format_string_minified, data_frame, placeholders)
@@ -5,7 +5,7 @@ from inspect import signature
 
 import argcomplete, argparse
 
-from collections import defaultdict, OrderedDict, namedtuple
+from collections import defaultdict, namedtuple
 
 import os
 import sys
@@ -19,7 +19,7 @@ from snippet.config import Config
 from snippet.models import Data
 from snippet.parsers import PlaceholderFormatParser, ArgumentFormatParser
 from snippet.processing import DataBuilder
-from snippet.utils import safe_join_path, log_format_template, log_format_string, print_line
+from snippet.utils import safe_join_path, log_format_template, log_format_string, print_lines
 
 app_name = "snippet"
 
@@ -31,10 +31,25 @@ app_config_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), ".sn
 home_config_path = os.path.join(str(Path.home()), ".snippet")
 
 
+class LazyEpilogArgumentParser(argparse.ArgumentParser):
+    """ Argument parser which only creates the epilog when the help is actually shown. """
+
+    def __init__(self, epilog_factory, **kwargs):
+        super().__init__(**kwargs)
+        self._epilog_factory = epilog_factory
+
+    def format_help(self):
+        if self.epilog is None:
+            # The epilog lists all presets and codecs which requires loading the profile and every codec.
+            self.epilog = self._epilog_factory()
+        return super().format_help()
+
+
 class Snippet(object):
 
     def __init__(self, config: Config):
         self._format_string = ""
+        self._placeholder_names = None
         self.config, self.logger = config, config.logger
         self.codec_formats = {}
         self.data = Data()
@@ -48,6 +63,8 @@ class Snippet(object):
                 self._format_string = os.linesep.join(format_string)
             else:
                 self._format_string = format_string
+            # The placeholders are parsed again on demand.
+            self._placeholder_names = None
 
     def _set_arguments(self, data_values):
         placeholder = None
@@ -73,8 +90,7 @@ class Snippet(object):
                                 if not placeholder:
                                     # No placeholders left to assign values to.
                                     # $ snippet -f "text" val1
-                                    self.logger.warning(
-                                        "Can not assign '{}' to unknown placeholder!".format(assigned_values))
+                                    self.logger.warning("Can not assign '%s' to unknown placeholder!", assigned_values)
                                     continue
                                 else:
                                     # Use the last placeholder if any.
@@ -113,7 +129,7 @@ class Snippet(object):
                     f.write(format_string)
 
             subprocess.call((self.config.editor, home_template_file))
-            self.logger.info("Successfully created template '{}'!".format(template_name))
+            self.logger.info("Successfully created template '%s'!", template_name)
         except:
             raise Exception("Creating template '{}' failed!".format(template_name))
 
@@ -129,10 +145,9 @@ class Snippet(object):
 
     def list_codecs(self, filter_string=None):
         if filter_string:
-            return sorted([codec_name for codec_name in self.config.codecs.keys() if
-                           filter_string in self.config.codecs.keys()])
+            return sorted(codec_name for codec_name in self.config.codecs if filter_string in codec_name)
         else:
-            return sorted(self.config.codecs.keys())
+            return sorted(self.config.codecs)
 
     def list_environment(self):
         result = []
@@ -144,14 +159,18 @@ class Snippet(object):
             temporary_data[placeholder] = reserved_placeholder_values[placeholder]
         for placeholder, values in temporary_data.items():
             if len(values) == 1:
-                result.append("export {}=\"{}\"".format(placeholder, values[0]))
+                result.append(f"export {placeholder}=\"{values[0]}\"")
             else:
-                result.append("export {}=\"\\('{}'\\)\"".format(placeholder, "' '".join(values)))
+                joined_values = "' '".join(values)
+                result.append(f"export {placeholder}=\"\\('{joined_values}'\\)\"")
         return result
 
     def list_placeholders(self):
         """ Returns all the placeholders found in the format string. """
-        return [placeholder.name for placeholder in PlaceholderFormatParser().parse(self._format_string)]
+        if self._placeholder_names is None:
+            self._placeholder_names = [
+                placeholder.name for placeholder in PlaceholderFormatParser.parse(self._format_string)]
+        return list(self._placeholder_names)
 
     def list_reserved_placeholders(self):
         """ Returns the list of reserved placeholders (aka Presets) e.g. 'datetime', 'date', ... """
@@ -160,9 +179,10 @@ class Snippet(object):
     def list_unset_placeholders(self):
         """ Returns the placeholders in the format string which are not associated with any value yet. """
         unset_placeholders = []
+        reserved_placeholders = set(self.list_reserved_placeholders())
         for placeholder in self.list_placeholders():
             if placeholder not in self.data and \
-                    placeholder not in self.list_reserved_placeholders():
+                    placeholder not in reserved_placeholders:
                 unset_placeholders.append(placeholder)
         return unset_placeholders
 
@@ -173,12 +193,9 @@ class Snippet(object):
         """
 
         reserved_placeholders = self.config.get_reserved_placeholder_values().keys()
+        data = self.data
 
-        def _import_environment(placeholder, data):
-            if data and placeholder not in reserved_placeholders:
-                self.data.append(placeholder, data)
-
-        for placeholder, data in os.environ.items():
+        for placeholder, value in os.environ.items():
             if not placeholder.islower() or placeholder.startswith("_"):
                 # Do not load upper case environment variables to prevent users from getting into the habit of
                 # defining upper case environment variables and messing up their environment.
@@ -189,8 +206,8 @@ class Snippet(object):
                 continue
 
             # Only set environment data when not already defined
-            if placeholder not in self.data:
-                _import_environment(placeholder, data)
+            if value and placeholder not in data and placeholder not in reserved_placeholders:
+                data.append(placeholder, value)
 
     def build(self):
         return DataBuilder(self._get_format_string(), self.data, self.codec_formats, self.config).build()
@@ -208,10 +225,8 @@ def main():
     def argparse_template_completer(prefix, parsed_args, **kwargs):
         return config.get_format_template_names()
 
-    parser = argparse.ArgumentParser(
-        description='snippet',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
+    def create_epilog():
+        return """
     Placeholder presets:
     
 """ + os.linesep.join(["  {}  {}".format(("<" + x.name + ">").rjust(20, ' '), x.description) for x in
@@ -257,6 +272,11 @@ def main():
         # Using codecs
         $ snippet -f "tar -czvf <archive:squote> <file:squote...>" /path/to/foo.tar file=foo bar
         """
+
+    parser = LazyEpilogArgumentParser(
+        create_epilog,
+        description='snippet',
+        formatter_class=argparse.RawDescriptionHelpFormatter
     )
     parser.add_argument('data_values', metavar='VALUE | PLACEHOLDER=VALUE | PLACEHOLDER:FILE', nargs='*',
                         help='When no placeholder is specified the first unset placeholder found in the format string will '
@@ -341,7 +361,7 @@ def main():
             log_format_template(format_template_name, logger)
 
         if not sys.stdin.isatty():
-            format_string = "".join(sys.stdin.readlines())
+            format_string = sys.stdin.read()
 
         if not format_string:
             format_string = os.environ.get("FORMAT_STRING")
@@ -365,10 +385,8 @@ def main():
             sys.exit(1)
 
         log_format_string(format_string, logger)
-        for lines in snippet.build():
-            # Handle format strings with line separators
-            for line in lines.splitlines():
-                print_line(line)
+        # Handle format strings with line separators
+        print_lines(line for lines in snippet.build() for line in lines.splitlines())
         sys.exit(0)
     except Exception as e:
         logger.error(str(e))
@@ -2,25 +2,26 @@ import os
 import sys
 
 from colorama import Fore, Style
-from iterfzf import iterfzf
 
 
 def log_format_string(format_string, logger):
-    logger.info(colorize("Format:", Fore.YELLOW))
-    for line in format_string.split(os.linesep):
-        if line.startswith("#"):
-            logger.info(colorize("   {}".format(line), Fore.BLUE))
-        else:
-            logger.info(colorize("   {}".format(line), Fore.WHITE))
+    logger.info_lines([colorize("Format:", Fore.YELLOW)] + [
+        colorize("   {}".format(line), Fore.BLUE if line.startswith("#") else Fore.WHITE)
+        for line in format_string.split(os.linesep)])
 
 
 def log_format_template(format_template_name, logger):
-    logger.info(colorize("Template:", Fore.YELLOW))
-    logger.info(colorize("   {}".format(format_template_name), Fore.WHITE))
+    logger.info_lines([colorize("Template:", Fore.YELLOW), colorize("   {}".format(format_template_name), Fore.WHITE)])
+
+
+# Only colorize output written to a terminal and honor https://no-color.org.
+_USE_COLOR = sys.stderr.isatty() and not os.environ.get("NO_COLOR")
 
 
 def colorize(string: str, color):
-    """ Colorize a string. """
+    """ Colorize a string. Returns the string unchanged when colors are disabled. """
+    if not _USE_COLOR:
+        return string
     return color + string + Style.RESET_ALL
 
 
@@ -32,30 +33,50 @@ def safe_join_path(*argv):
     return os.path.normpath(os.sep.join(argv))
 
 
-def replace_within(string: str, replacement: str, start: int, end: int) -> str:
-    """
-    Return a copy of string with text replaced within the range of position start and end with the replacement string.
-
-    string: the base string.
-    replacement: the text which serves as replacement.
-    start: the start position of the range with 0 <= start < len(text) && start <= end.
-    end: the end position of the range with 0 <= end < len(text).
-    """
-    return string[:start] + replacement + string[end:]
-
-
 def select_line(lines, query=None):
     """ Select format string from list of lines using iterfzf. """
     lines = [colorize(line, Fore.BLUE) if line.startswith("#") else line for line in lines.splitlines()]
     if len(lines) > 1:
+        from iterfzf import iterfzf
         return iterfzf(reversed(lines), query=query, multi=True, ansi=True)
     else:
         return lines
 
 
-def print_line(line):
-    """ Color printing a line of the (evaluated) format string regarding comments. """
-    if line.startswith("#"):
-        print(colorize(line, Fore.BLUE), file=sys.stderr)
-    else:
-        print(line)
\ No newline at end of file
+def print_lines(lines, buffer_size=65536):
+    """
+    Color printing the lines of the (evaluated) format string regarding comments.
+
+    Lines are encoded into a buffer which is written to the binary stdout in blocks of about buffer_size bytes instead
+    of calling print for every single line. Pending lines are written before a comment is printed to stderr to keep the
+    order of the output. Streams without a binary buffer are printed to line by line.
+    """
+    sys.stdout.flush()
+    out = getattr(sys.stdout, "buffer", None)
+    if out is None:
+        # Text-only streams (e.g. io.StringIO) do not provide a binary buffer.
+        for line in lines:
+            if line.startswith("#"):
+                print(colorize(line, Fore.BLUE), file=sys.stderr)
+            else:
+                print(line)
+        return
+
+    encoding, errors = sys.stdout.encoding, sys.stdout.errors
+    line_separator = os.linesep.encode(encoding)
+    buffer = bytearray()
+    for line in lines:
+        if line.startswith("#"):
+            if buffer:
+                out.write(buffer)
+                out.flush()
+                buffer.clear()
+            print(colorize(line, Fore.BLUE), file=sys.stderr)
+        else:
+            buffer += line.encode(encoding, errors)
+            buffer += line_separator
+            if len(buffer) >= buffer_size:
+                out.write(buffer)
+                buffer.clear()
+    out.write(buffer)
+    out.flush()
\ No newline at end of file
@@ -1,3 +1,5 @@
+import contextlib
+import io
 import logging
 import os
 import tempfile
@@ -187,6 +189,16 @@ class TestSnippet(unittest.TestCase):
             "<html>"
         ])
 
+    def test_escaped_angle_bracket_and_placeholder_in_format_string(self):
+        self.assertEqual(new_snippet("\<b\> <arg1>", ["arg1=test"]), [
+            "<b> test"
+        ])
+
+    def test_tab_between_placeholders(self):
+        self.assertEqual(new_snippet("<arg1>\t<arg2>", ["arg1=a", "arg2=b"]), [
+            "a\tb"
+        ])
+
     def test_argument_escaped_quote(self):
         self.assertEqual(new_snippet("<arg1>", ['arg1=\"']), [
             '\"'
@@ -224,6 +236,31 @@ class TestSnippet(unittest.TestCase):
             '"'
         ])
 
+    def test_minified_format_string_cache(self):
+        from snippet.parsers import _minify_format_string
+        # The minified format strings are only cached when debug logging is disabled.
+        config.logger.level = logging.INFO
+        try:
+            format_string = "a[ <b>]<c>"
+            self.assertEqual(new_snippet(format_string, ["c=1"]), ["a1"])
+            self.assertEqual(new_snippet(format_string, ["b=2", "c=1"]), ["a 21"])
+            hits = _minify_format_string.cache_info().hits
+            self.assertEqual(new_snippet(format_string, ["c=3"]), ["a3"])
+            self.assertEqual(new_snippet(format_string, ["b=4", "c=3"]), ["a 43"])
+            self.assertEqual(_minify_format_string.cache_info().hits, hits + 2)
+        finally:
+            config.logger.level = logging.DEBUG
+
+    def test_print_lines_to_text_stream(self):
+        from snippet.utils import print_lines
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            print_lines(["a", "b"])
+        self.assertEqual(stdout.getvalue(), "a\nb\n")
+
+    def test_list_codecs_with_filter(self):
+        self.assertEqual(Snippet(config).list_codecs("sha"), ["sha1", "sha256", "sha512"])
+
     @parameterized.expand([
         ['< arg1>', ['arg1=test']],  # illegal space
         ['<arg1 >', ['arg1=test']],  # illegal space